@@ -1,11 +1,16 @@
 # fraud_app.py
 
+from concurrent.futures import Future, ThreadPoolExecutor
+
 import streamlit as st
-import pandas as pd
 
 from fraud_utils import (
+    CITY_OPTIONS,
     FEATURES,
     FEATURE_DESCRIPTIONS,
+    KYC_OPTIONS,
+    MERCHANT_CATEGORIES,
+    load_model,
     predict_fraud,
 )
 
@@ -18,6 +23,30 @@ st.set_page_config(
 )
 
 
+# -------------------------------------------------------------------
+# Model (loaded once per server process, shared across sessions)
+# -------------------------------------------------------------------
+@st.cache_resource
+def _prewarm() -> Future:
+    # Load in the background so it overlaps with the user filling the form
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="model-loader")
+    future = executor.submit(load_model)
+    executor.shutdown(wait=False)
+    return future
+
+
+def get_model():
+    future = _prewarm()
+    try:
+        return future.result()  # returns immediately once loading is done
+    except Exception:
+        _prewarm.clear()  # retry on the next rerun
+        raise
+
+
+_prewarm()
+
+
 st.title("🕵️‍♂️ Mule / Fraud Transaction Detector")
 st.write(
     "Enter details of a transaction and customer profile below. "
@@ -26,255 +55,150 @@ st.write(
 
 
 # -------------------------------------------------------------------
-# Helper: options for categorical fields
+# UI: input editor configuration
 # -------------------------------------------------------------------
-CITY_OPTIONS = [
-    "Delhi",
-    "Mumbai",
-    "Bengaluru",
-    "Hyderabad",
-    "Kolkata",
-    "Chennai",
-    "Pune",
-    "Ahmedabad",
-    "Jaipur",
-    "Surat",
-    "Other",
-]
-
-KYC_OPTIONS = ["eKYC", "Minimum", "Full"]
-
-MERCHANT_CATEGORIES = [
-    "Groceries",
-    "Electronics",
-    "Food",
-    "Travel",
-    "Utility",
-    "Entertainment",
-    "Gaming",
-    "Crypto",
-    "Wallet",
-    "Other",
-]
+YES_NO = ["No", "Yes"]
+
+# One editable row, in FEATURES order
+DEFAULT_INPUT = {
+    "age": 30,
+    "city": "Bengaluru",
+    "account_tenure_months": 12,
+    "avg_monthly_balance": 25000.0,
+    "kyc_type": "Full",
+    "total_inflow_24hr": 50000.0,
+    "count_inflow_24hr": 3,
+    "count_unique_creditors_24hr": 2,
+    "total_outflow_24hr": 45000.0,
+    "count_outflow_24hr": 4,
+    "time_diff_first_inflow_to_outflow": 10.0,
+    "percent_inflow_cashed_out_1hr": 80.0,
+    "velocity_inflow_1hr": 1,
+    "velocity_outflow_1hr": 2,
+    "device_change_last_48hr": "No",
+    "new_payee_added_last_7d": "No",
+    "international_ip_flag": "No",
+    "txn_amount": 20000.0,
+    "txn_hour": 14,
+    "merchant_category": "Groceries",
+}
+
+
+def _number(label, feature, min_value=0, max_value=None, step=1):
+    return st.column_config.NumberColumn(
+        label,
+        min_value=min_value,
+        max_value=max_value,
+        step=step,
+        required=True,
+        help=FEATURE_DESCRIPTIONS[feature],
+    )
 
 
-# -------------------------------------------------------------------
-# UI: Collect inputs
-# -------------------------------------------------------------------
-with st.form("fraud_form"):
-    st.subheader("Customer Profile")
-
-    col1, col2 = st.columns(2)
-
-    with col1:
-        age = st.number_input(
-            "Age (years)",
-            min_value=18,
-            max_value=90,
-            value=30,
-            help=FEATURE_DESCRIPTIONS["age"],
-        )
-
-    with col2:
-        city = st.selectbox(
-            "City",
-            options=CITY_OPTIONS,
-            index=2,
-            help=FEATURE_DESCRIPTIONS["city"],
-        )
-
-    col3, col4 = st.columns(2)
-    with col3:
-        account_tenure_months = st.number_input(
-            "Account Tenure (months)",
-            min_value=0,
-            max_value=600,
-            value=12,
-            help=FEATURE_DESCRIPTIONS["account_tenure_months"],
-        )
-    with col4:
-        avg_monthly_balance = st.number_input(
-            "Average Monthly Balance (₹)",
-            min_value=0.0,
-            value=25000.0,
-            step=1000.0,
-            help=FEATURE_DESCRIPTIONS["avg_monthly_balance"],
-        )
-
-    kyc_type = st.selectbox(
-        "KYC Type",
-        options=KYC_OPTIONS,
-        index=2,
-        help=FEATURE_DESCRIPTIONS["kyc_type"],
+def _choice(label, feature, options):
+    return st.column_config.SelectboxColumn(
+        label,
+        options=options,
+        required=True,
+        help=FEATURE_DESCRIPTIONS[feature],
     )
 
-    st.markdown("---")
-    st.subheader("Recent Account Activity (24 hours)")
-
-    c1, c2 = st.columns(2)
-    with c1:
-        total_inflow_24hr = st.number_input(
-            "Total Inflow (₹, 24h)",
-            min_value=0.0,
-            value=50000.0,
-            step=1000.0,
-            help=FEATURE_DESCRIPTIONS["total_inflow_24hr"],
-        )
-    with c2:
-        count_inflow_24hr = st.number_input(
-            "Number of Credit Transactions (24h)",
-            min_value=0,
-            value=3,
-            help=FEATURE_DESCRIPTIONS["count_inflow_24hr"],
-        )
-
-    c3, c4 = st.columns(2)
-    with c3:
-        count_unique_creditors_24hr = st.number_input(
-            "Unique Creditors (24h)",
-            min_value=0,
-            value=2,
-            help=FEATURE_DESCRIPTIONS["count_unique_creditors_24hr"],
-        )
-    with c4:
-        total_outflow_24hr = st.number_input(
-            "Total Outflow (₹, 24h)",
-            min_value=0.0,
-            value=45000.0,
-            step=1000.0,
-            help=FEATURE_DESCRIPTIONS["total_outflow_24hr"],
-        )
-
-    c5, c6 = st.columns(2)
-    with c5:
-        count_outflow_24hr = st.number_input(
-            "Number of Debit Transactions (24h)",
-            min_value=0,
-            value=4,
-            help=FEATURE_DESCRIPTIONS["count_outflow_24hr"],
-        )
-    with c6:
-        time_diff_first_inflow_to_outflow = st.number_input(
-            "Minutes from First Inflow to First Outflow (24h)",
-            min_value=0.0,
-            value=10.0,
-            step=1.0,
-            help=FEATURE_DESCRIPTIONS["time_diff_first_inflow_to_outflow"],
-        )
-
-    percent_inflow_cashed_out_1hr = st.number_input(
+
+COLUMN_CONFIG = {
+    # Customer profile
+    "age": _number("Age (years)", "age", min_value=18, max_value=90),
+    "city": _choice("City", "city", CITY_OPTIONS),
+    "account_tenure_months": _number(
+        "Account Tenure (months)", "account_tenure_months", max_value=600
+    ),
+    "avg_monthly_balance": _number(
+        "Average Monthly Balance (₹)", "avg_monthly_balance", step=1000.0
+    ),
+    "kyc_type": _choice("KYC Type", "kyc_type", KYC_OPTIONS),
+    # Recent account activity (24 hours)
+    "total_inflow_24hr": _number("Total Inflow (₹, 24h)", "total_inflow_24hr", step=1000.0),
+    "count_inflow_24hr": _number("Number of Credit Transactions (24h)", "count_inflow_24hr"),
+    "count_unique_creditors_24hr": _number(
+        "Unique Creditors (24h)", "count_unique_creditors_24hr"
+    ),
+    "total_outflow_24hr": _number("Total Outflow (₹, 24h)", "total_outflow_24hr", step=1000.0),
+    "count_outflow_24hr": _number("Number of Debit Transactions (24h)", "count_outflow_24hr"),
+    "time_diff_first_inflow_to_outflow": _number(
+        "Minutes from First Inflow to First Outflow (24h)",
+        "time_diff_first_inflow_to_outflow",
+        step=1.0,
+    ),
+    "percent_inflow_cashed_out_1hr": _number(
         "Percent of Inflow Cashed Out within 1 hour (%)",
-        min_value=0.0,
+        "percent_inflow_cashed_out_1hr",
         max_value=100.0,
-        value=80.0,
         step=1.0,
-        help=FEATURE_DESCRIPTIONS["percent_inflow_cashed_out_1hr"],
-    )
+    ),
+    # Velocity & device behaviour
+    "velocity_inflow_1hr": _number("Credit Transactions in Last 1 hour", "velocity_inflow_1hr"),
+    "velocity_outflow_1hr": _number("Debit Transactions in Last 1 hour", "velocity_outflow_1hr"),
+    "device_change_last_48hr": _choice(
+        "Device Changed in Last 48h?", "device_change_last_48hr", YES_NO
+    ),
+    "new_payee_added_last_7d": _choice(
+        "New Payee Added in Last 7 days?", "new_payee_added_last_7d", YES_NO
+    ),
+    "international_ip_flag": _choice(
+        "International IP Detected?", "international_ip_flag", YES_NO
+    ),
+    # Current transaction details
+    "txn_amount": _number("Transaction Amount (₹)", "txn_amount", step=1000.0),
+    "txn_hour": _number("Transaction Hour of Day (0–23)", "txn_hour", max_value=23),
+    "merchant_category": _choice("Merchant Category", "merchant_category", MERCHANT_CATEGORIES),
+}
 
-    st.markdown("---")
-    st.subheader("Velocity & Device Behaviour")
-
-    v1, v2 = st.columns(2)
-    with v1:
-        velocity_inflow_1hr = st.number_input(
-            "Credit Transactions in Last 1 hour",
-            min_value=0,
-            value=1,
-            help=FEATURE_DESCRIPTIONS["velocity_inflow_1hr"],
-        )
-    with v2:
-        velocity_outflow_1hr = st.number_input(
-            "Debit Transactions in Last 1 hour",
-            min_value=0,
-            value=2,
-            help=FEATURE_DESCRIPTIONS["velocity_outflow_1hr"],
-        )
-
-    d1, d2, d3 = st.columns(3)
-    with d1:
-        device_change_last_48hr = st.selectbox(
-            "Device Changed in Last 48h?",
-            options=["No", "Yes"],
-            index=0,
-            help=FEATURE_DESCRIPTIONS["device_change_last_48hr"],
-        )
-    with d2:
-        new_payee_added_last_7d = st.selectbox(
-            "New Payee Added in Last 7 days?",
-            options=["No", "Yes"],
-            index=0,
-            help=FEATURE_DESCRIPTIONS["new_payee_added_last_7d"],
-        )
-    with d3:
-        international_ip_flag = st.selectbox(
-            "International IP Detected?",
-            options=["No", "Yes"],
-            index=0,
-            help=FEATURE_DESCRIPTIONS["international_ip_flag"],
-        )
-
-    st.markdown("---")
-    st.subheader("Current Transaction Details")
-
-    t1, t2 = st.columns(2)
-    with t1:
-        txn_amount = st.number_input(
-            "Transaction Amount (₹)",
-            min_value=0.0,
-            value=20000.0,
-            step=1000.0,
-            help=FEATURE_DESCRIPTIONS["txn_amount"],
-        )
-    with t2:
-        txn_hour = st.slider(
-            "Transaction Hour of Day (0–23)",
-            min_value=0,
-            max_value=23,
-            value=14,
-            help=FEATURE_DESCRIPTIONS["txn_hour"],
-        )
-
-    merchant_category = st.selectbox(
-        "Merchant Category",
-        options=MERCHANT_CATEGORIES,
-        help=FEATURE_DESCRIPTIONS["merchant_category"],
-    )
 
-    st.markdown("---")
+# -------------------------------------------------------------------
+# UI: Collect inputs
+# -------------------------------------------------------------------
+# A single data_editor instead of one widget per feature: edits are
+# sent back in one round-trip when the form is submitted.
+with st.form("fraud_form"):
+    st.subheader("Customer & Transaction Details")
+    st.caption("Edit the row below (scroll sideways for all fields); hover a header for help.")
+
+    edited = st.data_editor(
+        {f: [DEFAULT_INPUT[f]] for f in FEATURES},
+        column_config=COLUMN_CONFIG,
+        num_rows="fixed",
+        hide_index=True,
+        key="fraud_input",
+    )
 
     submitted = st.form_submit_button("Predict Fraud")
 
 
+# -------------------------------------------------------------------
+# Helper: debug view of the submitted inputs
+# -------------------------------------------------------------------
+_INPUT_TABLE_HEADER = "| Feature | Value |\n| --- | --- |\n"
+
+
+def _input_table_markdown(user_input) -> str:
+    """
+    Render the input dict as a two-column markdown table
+    (cheaper than building a DataFrame just for display).
+    """
+    return _INPUT_TABLE_HEADER + "\n".join(
+        f"| {key} | {value} |" for key, value in user_input.items()
+    )
+
+
 # -------------------------------------------------------------------
 # Build input dict & run prediction
 # -------------------------------------------------------------------
 if submitted:
-    # Map YES/NO to strings; conversion to 0/1 happens in fraud_utils
-    user_input = {
-        "age": age,
-        "city": city,
-        "account_tenure_months": account_tenure_months,
-        "avg_monthly_balance": avg_monthly_balance,
-        "kyc_type": kyc_type,
-        "total_inflow_24hr": total_inflow_24hr,
-        "count_inflow_24hr": count_inflow_24hr,
-        "count_unique_creditors_24hr": count_unique_creditors_24hr,
-        "total_outflow_24hr": total_outflow_24hr,
-        "count_outflow_24hr": count_outflow_24hr,
-        "time_diff_first_inflow_to_outflow": time_diff_first_inflow_to_outflow,
-        "percent_inflow_cashed_out_1hr": percent_inflow_cashed_out_1hr,
-        "velocity_inflow_1hr": velocity_inflow_1hr,
-        "velocity_outflow_1hr": velocity_outflow_1hr,
-        "device_change_last_48hr": device_change_last_48hr,
-        "new_payee_added_last_7d": new_payee_added_last_7d,
-        "international_ip_flag": international_ip_flag,
-        "txn_amount": txn_amount,
-        "txn_hour": txn_hour,
-        "merchant_category": merchant_category,
-    }
+    # The editor has exactly one row. YES/NO stay strings; conversion to
+    # 0/1 happens in fraud_utils.
+    user_input = {key: values[0] for key, values in edited.items()}
 
     try:
-        label, prob = predict_fraud(user_input, threshold=0.5)
+        label, prob = predict_fraud(user_input, threshold=0.5, model=get_model())
 
         st.subheader("Prediction Result")
         if label == 1:
@@ -284,7 +208,7 @@ if submitted:
 
         # Optional debug view
         with st.expander("Show input data used for prediction"):
-            st.write(pd.DataFrame([user_input]))
+            st.markdown(_input_table_markdown(user_input))
 
     except Exception as e:
         st.error(f"Error while running prediction: {e}")
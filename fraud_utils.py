@@ -1,15 +1,26 @@
 
 # fraud_utils.py
 
-import joblib
-import pandas as pd
+import pickle
+import threading
+import time
+from collections import deque
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Tuple
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
 
 # -------------------------------------------------------------------
 # Configuration
 # -------------------------------------------------------------------
 MODEL_FILENAME = "mule_fraud_model.pkl"  # change here if your file name differs
+# The loader is picked from the file suffix:
+#   .onnx   -> onnxruntime session (one input per feature column)
+#   .pickle -> plain pickle, protocol 5 (see export_model)
+#   other   -> joblib (format written by the training notebook)
+_MODEL_PATH = Path(__file__).resolve().parent / MODEL_FILENAME
 
 
 # -------------------------------------------------------------------
@@ -38,6 +49,20 @@ FEATURES = [
     "merchant_category",
 ]
 
+# Non-numeric columns (everything else is fed to the model as a number)
+CATEGORICAL_COLUMNS = ["city", "kyc_type", "merchant_category"]
+
+# Cached once so each prediction doesn't rebuild the column index
+_FEATURES_TUPLE = tuple(FEATURES)
+_FEATURES_INDEX = pd.Index(FEATURES)
+_FEATURES_SET = frozenset(FEATURES)
+
+# Numeric columns are built as float32, categorical ones stay object
+_NUMERIC_FEATURES = tuple(f for f in FEATURES if f not in CATEGORICAL_COLUMNS)
+_CATEGORICAL_FEATURES = tuple(f for f in FEATURES if f in CATEGORICAL_COLUMNS)
+_NUMERIC_POSITIONS = [FEATURES.index(f) for f in _NUMERIC_FEATURES]
+_CATEGORICAL_POSITIONS = [FEATURES.index(f) for f in _CATEGORICAL_FEATURES]
+
 FEATURE_DESCRIPTIONS: Dict[str, str] = {
     "age": "Customer age in years.",
     "city": "Customer’s primary city/location.",
@@ -66,26 +91,202 @@ FEATURE_DESCRIPTIONS: Dict[str, str] = {
 }
 
 
+# -------------------------------------------------------------------
+# Categorical options offered by the UI
+# -------------------------------------------------------------------
+CITY_OPTIONS = [
+    "Delhi",
+    "Mumbai",
+    "Bengaluru",
+    "Hyderabad",
+    "Kolkata",
+    "Chennai",
+    "Pune",
+    "Ahmedabad",
+    "Jaipur",
+    "Surat",
+    "Other",
+]
+
+KYC_OPTIONS = ["eKYC", "Minimum", "Full"]
+
+MERCHANT_CATEGORIES = [
+    "Groceries",
+    "Electronics",
+    "Food",
+    "Travel",
+    "Utility",
+    "Entertainment",
+    "Gaming",
+    "Crypto",
+    "Wallet",
+    "Other",
+]
+
+
 # -------------------------------------------------------------------
 # Model loader (cached at module level)
 # -------------------------------------------------------------------
 _model = None
+# Probability method resolved once per loaded model (see _resolve_predict_proba)
+_predict_proba_fn: Optional[Callable[[Any], np.ndarray]] = None
+# Whether the loaded model needs a DataFrame (see _needs_dataframe)
+_NEEDS_DATAFRAME = True
+
+
+def _sigmoid_proba(scores) -> np.ndarray:
+    """
+    Logistic transform of decision scores into an (n_rows, 2) probability
+    array, computed in place over one contiguous float64 buffer.
+    """
+    out = np.empty((len(scores), 2), dtype=np.float64)
+    p = out[:, 1]
+    # sigmoid(x) = exp(-log(1 + exp(-x))), which doesn't overflow for large |x|
+    np.logaddexp(0.0, -np.ascontiguousarray(scores, dtype=np.float64).ravel(), out=p)
+    np.negative(p, out=p)
+    np.exp(p, out=p)
+    np.subtract(1.0, p, out=out[:, 0])
+    return out
+
+
+def _resolve_predict_proba(model) -> Callable[[Any], np.ndarray]:
+    """
+    Pick the model's probability method once, so scoring doesn't redo
+    the attribute lookups on every call. The returned callable always
+    yields an (n_rows, 2) array like predict_proba.
+    """
+    if hasattr(model, "predict_proba"):
+        return model.predict_proba
+
+    # Some models don't expose predict_proba; fall back to decision_function
+    if hasattr(model, "decision_function"):
+        decision_function = model.decision_function
+
+        def proba_from_decision(X) -> np.ndarray:
+            return _sigmoid_proba(decision_function(X))
+
+        return proba_from_decision
+
+    # Very last resort: 0 or 1 directly from predict
+    predict = model.predict
+
+    def proba_from_predict(X) -> np.ndarray:
+        p = np.asarray(predict(X), dtype=float)
+        return np.column_stack((1 - p, p))
+
+    return proba_from_predict
+
+
+class _OnnxModel:
+    """
+    Minimal predict_proba adapter around an onnxruntime session, so the
+    rest of this module can treat it like the sklearn pipeline.
+    """
+
+    def __init__(self, session):
+        self._session = session
+        self._inputs = [i.name for i in session.get_inputs()]
+        outputs = [o.name for o in session.get_outputs()]
+        # "probabilities" with zipmap=False, else the default "output_probability"
+        self._proba_output = "probabilities" if "probabilities" in outputs else outputs[-1]
+
+    def predict_proba(self, X: pd.DataFrame) -> np.ndarray:
+        if len(self._inputs) == 1:
+            feed = {self._inputs[0]: np.asarray(X, dtype=np.float32)}
+        else:
+            # One input per column, as produced by skl2onnx for mixed types
+            feed = {
+                name: X[name].to_numpy(
+                    dtype=str if name in CATEGORICAL_COLUMNS else np.float32
+                ).reshape(-1, 1)
+                for name in self._inputs
+            }
+        proba = self._session.run([self._proba_output], feed)[0]
+        if isinstance(proba, list):
+            # skl2onnx's default ZipMap output: one {class: proba} dict per
+            # row. Classes are sorted like sklearn's classes_.
+            classes = sorted(proba[0]) if proba else [0, 1]
+            return np.array(
+                [[row[c] for c in classes] for row in proba], dtype=np.float64
+            ).reshape(len(proba), len(classes))
+        return proba
+
+
+def _read_model(model_path: Path):
+    """
+    Deserialize a model file, choosing the loader from its suffix.
+    """
+    if model_path.suffix == ".onnx":
+        import onnxruntime
+
+        session = onnxruntime.InferenceSession(
+            str(model_path), providers=["CPUExecutionProvider"]
+        )
+        return _OnnxModel(session)
+    if model_path.suffix == ".pickle":
+        with open(model_path, "rb") as fh:
+            return pickle.load(fh)
+
+    # Only needed here, so keep it off the import path
+    import joblib
+
+    return joblib.load(model_path)
+
+
+def export_model(model, dest: Path) -> None:
+    """
+    Save the trained pipeline as a plain protocol-5 pickle, which loads
+    faster than joblib for this model. Point MODEL_FILENAME at the new
+    file to use it.
+    """
+    dest = Path(dest)
+    if dest.suffix != ".pickle":
+        raise ValueError(f"Unsupported export format: {dest.suffix}")
+    with open(dest, "wb") as fh:
+        pickle.dump(model, fh, protocol=5)
 
 
 def load_model():
     """
     Load the trained pipeline from disk (only once).
     """
-    global _model
+    global _model, _predict_proba_fn, _NEEDS_DATAFRAME
     if _model is None:
-        here = Path(__file__).resolve().parent
-        model_path = here / MODEL_FILENAME
-        if not model_path.exists():
-            raise FileNotFoundError(f"Model file not found: {model_path}")
-        _model = joblib.load(model_path)
+        if not _MODEL_PATH.is_file():
+            raise FileNotFoundError(f"Model file not found: {_MODEL_PATH}")
+        model = _read_model(_MODEL_PATH)
+        _predict_proba_fn = _resolve_predict_proba(model)
+        _NEEDS_DATAFRAME = _needs_dataframe(model)
+        _model = model
+        _predict_cached.cache_clear()
     return _model
 
 
+def _needs_dataframe(model) -> bool:
+    """
+    True if the model selects columns by name (a ColumnTransformer step,
+    fitted feature names, or the ONNX adapter); otherwise a plain ndarray
+    can be passed and the DataFrame construction skipped.
+    """
+    if isinstance(model, _OnnxModel) or hasattr(model, "feature_names_in_"):
+        return True
+    # Only needed here, so keep sklearn off the import path
+    from sklearn.compose import ColumnTransformer
+
+    steps = [step for _, step in getattr(model, "steps", [])] or [model]
+    return any(isinstance(step, ColumnTransformer) for step in steps)
+
+
+def _scoring_for(model) -> Tuple[Callable[[Any], np.ndarray], bool]:
+    """
+    (probability callable, needs DataFrame) for the given model, reusing
+    what load_model resolved when it is the module's cached model.
+    """
+    if model is _model and _predict_proba_fn is not None:
+        return _predict_proba_fn, _NEEDS_DATAFRAME
+    return _resolve_predict_proba(model), _needs_dataframe(model)
+
+
 # -------------------------------------------------------------------
 # Input preparation
 # -------------------------------------------------------------------
@@ -96,22 +297,108 @@ BINARY_COLUMNS = [
 ]
 
 
+# Pre-normalised YES/NO / bool representations -> 0/1.
+# (True/False hash like 1/0, and 1.0/0.0 like 1/0, so they are covered too.)
+_BINARY_LOOKUP: Dict[Any, int] = {
+    **dict.fromkeys(("yes", "y", "true", "1", 1), 1),
+    **dict.fromkeys(("no", "n", "false", "0", 0), 0),
+}
+
+
 def _to_binary(value: Any) -> int:
     """
     Convert various YES/NO / bool representations to 0/1.
     """
-    if isinstance(value, bool):
-        return int(value)
-    if isinstance(value, (int, float)):
-        return int(value)
     if isinstance(value, str):
-        v = value.strip().lower()
-        if v in {"yes", "y", "true", "1"}:
-            return 1
-        if v in {"no", "n", "false", "0"}:
-            return 0
-    # fallback: treat anything else as 0
-    return 0
+        value = value.strip().lower()
+    try:
+        return _BINARY_LOOKUP.get(value, 0)
+    except TypeError:
+        # unhashable value
+        return 0
+
+
+def _row_item(f: str) -> str:
+    if f in BINARY_COLUMNS:
+        return f"_to_binary(d.get({f!r}, 0))"
+    return f"d[{f!r}]"
+
+
+def _build_fast_row():
+    """
+    Generate a straight-line row builder for the fixed FEATURES schema:
+    plain lookups for regular columns, _to_binary (defaulting to 0) for
+    binary columns. Avoids a per-call loop over FEATURES.
+    """
+    items = ", ".join(_row_item(f) for f in FEATURES)
+    namespace = {"_to_binary": _to_binary}
+    exec(f"def _fast_row(d):\n    return [{items}]\n", namespace)
+    return namespace["_fast_row"]
+
+
+_fast_row = _build_fast_row()
+
+# Features that must be present (binary columns default to 0)
+_REQUIRED_FEATURES = _FEATURES_SET.difference(BINARY_COLUMNS)
+
+
+def _prepare_row(user_input: Dict[str, Any]) -> List[Any]:
+    """
+    Normalise a raw user input dict into a list of feature values
+    in the column order expected by the model.
+    """
+    try:
+        return _fast_row(user_input)
+    except KeyError:
+        # Only reached on bad input: report every missing feature at once
+        missing = _REQUIRED_FEATURES.difference(user_input)
+        missing = [f for f in FEATURES if f in missing]  # keep column order
+        raise ValueError(f"Missing required feature(s): {missing}") from None
+
+
+def _rows_to_matrix(rows: List[List[Any]]) -> np.ndarray:
+    """
+    Stack prepared rows into a single (n_rows, n_features) object array.
+    """
+    return np.array(rows, dtype=object).reshape(len(rows), len(_FEATURES_TUPLE))
+
+
+def _matrix_to_frame(arr: np.ndarray) -> pd.DataFrame:
+    """
+    Wrap a row matrix in a DataFrame, skipping pandas' list-of-lists
+    inference path. Numeric columns are converted to float32 in one
+    pass; categorical columns keep their original objects.
+    """
+    numeric = arr[:, _NUMERIC_POSITIONS].astype(np.float32)
+    categorical = arr[:, _CATEGORICAL_POSITIONS]
+
+    columns = dict(zip(_NUMERIC_FEATURES, numeric.T))
+    columns.update(zip(_CATEGORICAL_FEATURES, categorical.T))
+    return pd.DataFrame(columns, columns=_FEATURES_INDEX)
+
+
+def _matrix_to_array(arr: np.ndarray) -> np.ndarray:
+    """
+    Row matrix as model input for models that don't need column names:
+    float32 when every value is numeric, object otherwise.
+    """
+    try:
+        return arr.astype(np.float32)
+    except (TypeError, ValueError):
+        return arr
+
+
+def _score_matrix(model, arr: np.ndarray) -> np.ndarray:
+    """
+    Fraud probability for each row of a row matrix, as a 1-D array.
+    """
+    predict_proba, needs_dataframe = _scoring_for(model)
+    X = _matrix_to_frame(arr) if needs_dataframe else _matrix_to_array(arr)
+    return predict_proba(X)[:, 1]
+
+
+def _score_rows(model, rows: List[List[Any]]) -> np.ndarray:
+    return _score_matrix(model, _rows_to_matrix(rows))
 
 
 def prepare_input_df(user_input: Dict[str, Any]) -> pd.DataFrame:
@@ -119,52 +406,217 @@ def prepare_input_df(user_input: Dict[str, Any]) -> pd.DataFrame:
     Take raw user input dict from the UI, ensure:
     - all expected feature columns are present
     - binary columns are converted to 0/1 ints
+    - numeric columns are float32
     - columns are in the correct order for the model
     """
-    data = dict(user_input)  # shallow copy
+    # Create single-row DataFrame with correct column order
+    return _matrix_to_frame(_rows_to_matrix([_prepare_row(user_input)]))
 
-    # Normalise binary columns
-    for col in BINARY_COLUMNS:
-        if col in data:
-            data[col] = _to_binary(data[col])
-        else:
-            data[col] = 0  # default
 
-    # Ensure all expected feature columns exist
-    missing = [f for f in FEATURES if f not in data]
-    if missing:
-        raise ValueError(f"Missing required feature(s): {missing}")
+def prepare_input_batch_df(inputs: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Same as prepare_input_df, but for many input dicts at once
+    (one DataFrame row per input).
+    """
+    rows = [_prepare_row(user_input) for user_input in inputs]
+    return _matrix_to_frame(_rows_to_matrix(rows))
 
-    # Create single-row DataFrame with correct column order
-    df = pd.DataFrame([[data[f] for f in FEATURES]], columns=FEATURES)
-    return df
+
+# -------------------------------------------------------------------
+# Micro-batching worker
+# -------------------------------------------------------------------
+# Concurrent Streamlit sessions each call predict_fraud with a single
+# row. Instead of paying the full pipeline dispatch cost per row, calls
+# are queued and a background thread scores them together: while other
+# predict_fraud calls are in flight it waits up to MAX_LATENCY_MS for
+# their rows to arrive, then runs up to MAX_BATCH rows through a single
+# predict_proba call. A lone request is dispatched immediately.
+MAX_BATCH = 64
+MAX_LATENCY_MS = 20
+
+# Queue items are (row, model, done_event, result_slot), where row comes
+# from _prepare_row; the worker writes either ("ok", proba) or
+# ("error", exception) into result_slot.
+_queue: Deque[Tuple[List[Any], Any, threading.Event, list]] = deque()
+_queue_cond = threading.Condition()
+_worker: Optional[threading.Thread] = None
+# Number of predict_fraud calls currently running (guarded by _queue_cond)
+_in_flight = 0
+
+# Row matrix reused across batches by the worker (grown on demand),
+# instead of allocating a fresh object array for every batch.
+_SCRATCH = np.empty((0, len(FEATURES)), dtype=object)
+_SCRATCH_LOCK = threading.Lock()
+
+
+def _ensure_worker() -> None:
+    """
+    Start the batching thread on first use.
+    """
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+    with _queue_cond:
+        if _worker is None or not _worker.is_alive():
+            _worker = threading.Thread(
+                target=_batch_worker, name="fraud-batcher", daemon=True
+            )
+            _worker.start()
+
+
+def _next_batch() -> list:
+    """
+    Block until at least one request is queued, then collect up to
+    MAX_BATCH requests. Only waits (at most MAX_LATENCY_MS) while other
+    predict_fraud calls are in flight but haven't queued their row yet.
+    """
+    with _queue_cond:
+        while not _queue:
+            _queue_cond.wait()
+        deadline = time.monotonic() + MAX_LATENCY_MS / 1000
+        while len(_queue) < min(_in_flight, MAX_BATCH):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            _queue_cond.wait(remaining)
+        return [_queue.popleft() for _ in range(min(MAX_BATCH, len(_queue)))]
+
+
+def _fill_scratch(rows: List[List[Any]]) -> np.ndarray:
+    """
+    Copy rows into the shared scratch matrix and return a view of the
+    filled part. Callers must hold _SCRATCH_LOCK while using the view.
+    """
+    global _SCRATCH
+    if _SCRATCH.shape[0] < len(rows):
+        _SCRATCH = np.empty((max(len(rows), MAX_BATCH), len(FEATURES)), dtype=object)
+    view = _SCRATCH[: len(rows)]
+    view[...] = rows
+    return view
+
+
+def _score_batch(batch: list) -> None:
+    """
+    Score one batch of queued requests and hand results back to callers.
+    Requests are grouped per model so each model is called once; if that
+    call fails, the group is rescored row by row.
+    """
+    groups: Dict[int, Tuple[Any, list, list]] = {}
+    for row, model, _, slot in batch:
+        _, rows, pending = groups.setdefault(id(model), (model, [], []))
+        rows.append(row)
+        pending.append(slot)
+
+    for model, rows, pending in groups.values():
+        try:
+            with _SCRATCH_LOCK:
+                probas = _score_matrix(model, _fill_scratch(rows))
+            for slot, proba in zip(pending, probas):
+                slot[:] = ["ok", float(proba)]
+        except Exception:
+            # Score rows one by one so a bad row only fails its own request
+            for row, slot in zip(rows, pending):
+                try:
+                    slot[:] = ["ok", float(_score_rows(model, [row])[0])]
+                except Exception as e:
+                    slot[:] = ["error", e]
+
+    for _, _, done, _ in batch:
+        done.set()
+
+
+def _batch_worker() -> None:
+    while True:
+        _score_batch(_next_batch())
+
+
+def _score_queued(model, row: List[Any]) -> float:
+    """
+    Hand one prepared row to the batching worker and wait for its
+    fraud probability.
+    """
+    _ensure_worker()
+    done = threading.Event()
+    slot: list = [None, None]
+    with _queue_cond:
+        _queue.append((row, model, done, slot))
+        _queue_cond.notify()
+    done.wait()
+
+    status, value = slot
+    if status == "error":
+        raise value
+    return value
+
+
+# Memoised probabilities for repeated inputs scored with the module's
+# cached model, keyed on the prepared row (so e.g. "Yes" and 1 share an
+# entry). Models aren't part of the key, so the cache never keeps one
+# alive; load_model clears it whenever it loads a model. The threshold
+# is not part of the key either: it is applied to the cached
+# probability afterwards.
+@lru_cache(maxsize=1024)
+def _predict_cached(row: Tuple[Any, ...]) -> float:
+    return _score_queued(_model, list(row))
 
 
 # -------------------------------------------------------------------
 # Prediction API used by Streamlit app
 # -------------------------------------------------------------------
-def predict_fraud(user_input: Dict[str, Any], threshold: float = 0.5) -> Tuple[int, float]:
+def predict_fraud_batch(
+    inputs: List[Dict[str, Any]], threshold: float = 0.5, model=None
+) -> List[Tuple[int, float]]:
+    """
+    Score many raw input dicts with a single model call.
+    Returns one (label, probability) tuple per input, in order.
+    If model is given it is used instead of the module-level one.
+    """
+    if not inputs:
+        return []
+    if model is None:
+        model = load_model()
+    probas = _score_rows(model, [_prepare_row(user_input) for user_input in inputs])
+    probas = np.asarray(probas, dtype=np.float64)
+    labels = (probas >= threshold).astype(np.int8)
+    return list(zip(labels.tolist(), probas.tolist()))
+
+
+def predict_fraud(
+    user_input: Dict[str, Any], threshold: float = 0.5, model=None
+) -> Tuple[int, float]:
     """
     Given a raw input dict, return:
     - predicted label (0 = genuine, 1 = fraud)
     - fraud probability (float between 0 and 1)
+
+    If model is given (e.g. the Streamlit-cached pipeline) it is used
+    instead of the module-level one. Probabilities for repeated inputs
+    are memoised when scored with the module-level model; new rows are
+    scored by the background batching worker together with any other
+    requests that arrive at the same time.
     """
-    model = load_model()
-    X = prepare_input_df(user_input)
+    global _in_flight
+    if model is None:
+        model = load_model()
 
-    if hasattr(model, "predict_proba"):
-        proba = model.predict_proba(X)[0, 1]
-    else:
-        # Some models don't expose predict_proba; fall back to decision_function
-        if hasattr(model, "decision_function"):
-            score = model.decision_function(X)[0]
-            # simple logistic transform
-            import math
-
-            proba = 1 / (1 + math.exp(-score))
+    with _queue_cond:
+        _in_flight += 1
+    try:
+        row = tuple(_prepare_row(user_input))
+        try:
+            hash(row)
+            cacheable = model is _model
+        except TypeError:
+            # unhashable feature value: skip the cache
+            cacheable = False
+        if cacheable:
+            proba = _predict_cached(row)
         else:
-            # Very last resort: 0 or 1 directly from predict
-            proba = float(model.predict(X)[0])
+            proba = _score_queued(model, list(row))
+    finally:
+        with _queue_cond:
+            _in_flight -= 1
+            _queue_cond.notify()  # the worker may be waiting on this call
 
     label = int(proba >= threshold)
     return label, float(proba)